@@ -1,56 +1,89 @@
 import argparse
-from webwin import WebWinApp
+from webwin import WebWinApp, pure
 
+# 参数项调整（见 DemoApp.adjust_argparser）
+_ARG_SPEC = {
+    # 修改参数项设置
+    '--port': {'required': True, 'help': '端口 [必须]'}, # 从可选改为必须
+    '--browser': {'help': argparse.SUPPRESS}, # 从帮助信息中隐藏该参数项，但依旧可用
+    # 删除参数项，用 WebWinApp.Args 的默认值
+    '--size': None, # 该参数用户不可设置，用默认值
+    '--del-js': None, # 该参数用户不可设置，用默认值
+    '--run-js': None, # 该参数用户不可设置，用默认值
+    # 删除参数项，后面会设置固定值
+    '--webroot': None, # 该参数用户不可设置，webroot 为固定值
+    '--mainpage': None, # 该参数用户不可设置，mainpage 为固定值
+}
+
+@pure
 def swap(a, b):
-    print('swap():', a, b)
+    if __debug__: # python -O 时不输出
+        print('swap():', a, b)
     return [b, a]
 
 class World:
+    __slots__ = ('myname', 'name_1', 'name_2', '_hello_cache', '_tmpl')
+
     def __init__(self, myname):
         self.myname = myname
         self.name_1 = ''
         self.name_2 = ''
+        self._hello_cache = None
+        self._tmpl = ("Hello, <name>", "</name>!<br /> Hello, <name>", "</name>!<br /> I'm <name>", "</name>.")
+
+    def _set_myname(self, name): # _ 开头，不提供给前端
+        self.myname = name
+        self._hello_cache = None
 
     def set_name_1(self, name):
         self.name_1 = name
+        self._hello_cache = None
 
     def set_name_2(self, name):
         self.name_2 = name
+        self._hello_cache = None
 
+    @pure
     def hello(self):
-        return f"Hello, <name>{self.name_1}</name>!<br /> Hello, <name>{self.name_2}</name>!<br /> I'm <name>{self.myname}</name>."
+        c = self._hello_cache
+        if c is not None:
+            return c
+        t = self._tmpl
+        c = "".join((t[0], self.name_1, t[1], self.name_2, t[2], self.myname, t[3]))
+        self._hello_cache = c
+        return c
 
 class DemoApp(WebWinApp):
+    WEBROOT = '.'
+    MAINPAGE = 'demo.html'
+    _NAME_SUFFIX = ' WebWin'
+
     def adjust_argparser(self):
         super().adjust_argparser()
-        # 修改参数项设置
-        self.argparser.mod_argument('--port', required=True, help='端口 [必须]') # 从可选改为必须
-        self.argparser.mod_argument('--browser', help=argparse.SUPPRESS) # 从帮助信息中隐藏该参数项，但依旧可用
-        # 删除参数项，用 WebWinApp.Args 的默认值
-        self.argparser.del_argument('--size') # 该参数用户不可设置，用默认值
-        self.argparser.del_argument('--del-js') # 该参数用户不可设置，用默认值
-        self.argparser.del_argument('--run-js') # 该参数用户不可设置，用默认值
-        # 删除参数项，后面会设置固定值
-        self.argparser.del_argument('--webroot') # 该参数用户不可设置，webroot 为固定值
-        self.argparser.del_argument('--mainpage') # 该参数用户不可设置，mainpage 为固定值
+        self.argparser.adjust_arguments(_ARG_SPEC)
         # 增加参数项
         self.argparser.add_argument('-n', '--name', default='WebWin', help='名字 [default: WebWin]')
         self.argparser.epilog = '' # clear epilog
 
     def apply_args(self):
         # 设置参数固定值
-        self.args.webroot = '.'
-        self.args.mainpage = 'demo.html'
+        self.args.webroot = self.WEBROOT
+        self.args.mainpage = self.MAINPAGE
         # 修改用户输入的参数
-        if self.args.name != 'WebWin':
-            self.args.name = self.args.name + ' WebWin'
+        if (n := self.args.name) != 'WebWin':
+            self.args.name = n + self._NAME_SUFFIX
+        # run() 每次都会调用 apply_args()，World 只创建一次，之后只更新名字
+        if getattr(self, 'world', None) is None:
+            self.world = World(self.args.name)
+        elif self.world.myname != self.args.name:
+            self.world._set_myname(self.args.name)
         super().apply_args()
         print('webroot', self.mainwin.webroot)
 
     def bind_all(self):
         super().bind_all()
         self.mainwin.bind_func(swap)
-        self.mainwin.bind_object(World(self.args.name))
+        self.mainwin.bind_object(self.world)
 
 # 打包时会把前端网页一起打包，因此需要：
 # 创建 App 时启用 webroot 包内定位标志：
@@ -8,18 +8,18 @@ setup(
     py_modules=['webwin'], # only one python file
 
     # 表明当前模块依赖哪些包，若环境中没有，则会从pypi中下载安装
-    install_requires=['webui2==2.4.5',
-                      'chardet>=5.0',
-                      'pyinstaller>=6.0'],
+    install_requires=['webui2>=2.4.5,<2.5',
+                      'chardet>=5.0'],
     # 限定 python 版本
-    python_requires='>=3.8',
+    python_requires='>=3.10',
     # install_requires 在安装模块时会自动安装依赖包
     # 而 extras_require 不会，这里仅表示该模块会依赖这些包
     # 但是这些包通常不会使用到，只有当你深度使用模块时，才会用到，这里需要你手动安装
-    # extras_require={
-    #     'pack':  ["ReportLab>=1.2", "RXP"],
-    #     'reST': ["docutils>=0.3"],
-    # }
+    # pip install webwin[pack]
+    extras_require={
+        'pack': ['pyinstaller>=6.0'], # 仅打包应用时需要
+        'fast': ['orjson>=3'], # 更快的前后端调用数据序列化
+    },
 
     # metadata to display on PyPI
     author="Cataerog Gong",
@@ -43,9 +43,8 @@ setup(
         'Natural Language :: Chinese (Simplified)',
         # 目标 Python 版本
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.8',
-        'Programming Language :: Python :: 3.9',
         'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Programming Language :: Python :: Implementation :: CPython',
         # 属于什么类型
         'Topic :: Software Development',
@@ -14,9 +14,11 @@ License: MIT (see LICENSE for details)
 """
 
 import argparse
+import atexit
+import codecs
 from collections.abc import Iterable
-from datetime import datetime
 import fnmatch
+import functools
 import inspect
 import io
 import json
@@ -25,50 +27,155 @@ import pathlib
 import re
 import shlex
 import socket
+import stat
 import string
 import sys
+import time
 import traceback
-from typing import Dict, Iterable, List, Tuple
+import warnings
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import chardet
+try: # 可选依赖，更快的编码识别，接口及识别模型同 chardet
+    import cchardet as _enc_detector
+except ImportError:
+    _enc_detector = chardet
 from webui import webui
+try: # 可选依赖，更快的 JSON 序列化
+    import orjson
+except ImportError:
+    orjson = None
+    try:
+        import ujson
+    except ImportError:
+        ujson = None
 
 
 __version__ = "0.2.1"
 VERSION = re.split(r'[\.\-_]', __version__)
 
+_TIME_FMT = '%Y-%m-%d %H:%M:%S'
+
 
-def detect_enc(filename, default_encoding='ascii'):
+@functools.cache
+def _check_webui2_version():
+    """ webui2 版本不在支持范围 [2.4.5, 2.5) 内时给出警告
+
+    只在创建第一个 WebWin 时检查一次，不拖慢 import webwin
+    """
+    import importlib.metadata
+    try:
+        ver = importlib.metadata.version('webui2')
+    except importlib.metadata.PackageNotFoundError: # 打包后的程序中没有包信息
+        return
+    v = tuple(int(x) for x in re.findall(r'\d+', ver)[:3])
+    if not ((2, 4, 5) <= v < (2, 5)):
+        warnings.warn(f'webwin {__version__} requires webui2>=2.4.5,<2.5, but webui2=={ver} is installed', RuntimeWarning)
+
+
+if orjson:
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    def _json_key(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+    _json_loads = orjson.loads
+elif ujson:
+    def _json_dumps(obj) -> str:
+        return ujson.dumps(obj, ensure_ascii=False)
+    def _json_key(obj) -> str:
+        return ujson.dumps(obj, sort_keys=True)
+    _json_loads = ujson.loads
+else:
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+    def _json_key(obj) -> str:
+        return json.dumps(obj, sort_keys=True)
+    _json_loads = json.loads
+
+
+# 按顺序检查，UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头
+_BOMS = ((codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+         (codecs.BOM_UTF8, 'utf-8-sig'),
+         (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+def _detect_enc_bytes(data: bytes, default_encoding='ascii') -> str:
+    """ 识别字节串的编码：先检查 BOM，是有效的 UTF-8（包括纯 ASCII）时视为 utf-8，否则用 chardet 识别 """
+    for bom, enc in _BOMS:
+        if data.startswith(bom):
+            return enc
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(data) # 不要求结尾完整，样本可能截断了多字节字符
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    r = _enc_detector.detect(data)
+    # 经常把 GBK 识别成 GB2312，gb18030 > gbk > gb2312，所以 LEGACY_MAP 转换一下
+    return (chardet.UniversalDetector.LEGACY_MAP.get(r['encoding'].lower(), r['encoding']) if r and r['encoding'] else default_encoding)
+
+@functools.lru_cache(maxsize=256)
+def _detect_enc_cached(filename, mtime_ns, size, default_encoding, sample_size):
+    with open(filename, 'rb') as f:
+        return _detect_enc_bytes(f.read(sample_size), default_encoding)
+
+def detect_enc(filename, default_encoding='ascii', sample_size=65536):
     """ 自动识别文件编码
 
+    只读取文件开头 sample_size 字节进行识别：先检查 BOM，是有效的 UTF-8（包括纯 ASCII）时视为 utf-8，否则用 chardet 识别。
+
+    识别结果按 (文件路径, 修改时间, 文件大小) 缓存，文件未改变时不重复识别。
+    `detect_enc.cache_clear()` 清除缓存。
+
     :param default_encoding: (str) 万一没有识别出文件编码时使用的缺省编码
+    :param sample_size: (int) 用于识别的字节数
     """
-    r = None
-    with open(filename, 'rb') as f:
-        d = chardet.UniversalDetector()
-        for l in f:
-            d.feed(l)
-            if d.done:
-                break
-        r = d.close()
-    # 经常把 GBK 识别成 GB2312，gb18030 > gbk > gb2312，所以 LEGACY_MAP 转换一下
-    return (d.LEGACY_MAP.get(r['encoding'].lower(), r['encoding']) if r and r['encoding'] else default_encoding)
+    filename = os.path.abspath(filename)
+    st = os.stat(filename)
+    return _detect_enc_cached(filename, st.st_mtime_ns, st.st_size, default_encoding, sample_size)
 
-def open_any_enc(filename, mode='r', default_encoding='ascii'):
+detect_enc.cache_clear = _detect_enc_cached.cache_clear
+
+def open_any_enc(filename, mode='r', default_encoding='ascii', sample_size=65536):
     """ open “自动识别文件编码”版本
 
     :param default_encoding: (str) 万一没有识别出文件编码时使用的缺省编码
+    :param sample_size: (int) 用于识别编码的字节数
     """
-    return open(filename, mode, encoding=detect_enc(filename, default_encoding))
+    return open(filename, mode, encoding=detect_enc(filename, default_encoding, sample_size))
 
-def is_port_valid(p: int) -> bool:
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+def read_text_any_enc(filename, default_encoding='ascii', sample_size=65536) -> str:
+    """ 读取文本文件内容（自动识别文件编码）
+
+    只读一次文件，先用开头 sample_size 字节识别编码并解码；解码失败时用失败处起的 sample_size 字节重新识别再解码，
+    仍失败时才把无法解码的字符替换为 '\ufffd'。
+    与文本模式 open 一样，换行符统一转换为 '\n'。
+
+    :param default_encoding: (str) 万一没有识别出文件编码时使用的缺省编码
+    :param sample_size: (int) 用于识别编码的字节数
+    """
+    data = pathlib.Path(filename).read_bytes()
     try:
-        s.bind(('127.0.0.1', p))
-        return True
-    except OSError:
-        return False
-    finally:
-        s.close()
+        text = data.decode(_detect_enc_bytes(data[:sample_size], default_encoding))
+    except UnicodeDecodeError as e:
+        # 样本之后才出现非 ASCII 内容：用解码失败处起的 sample_size 字节重新识别（全部内容识别时容易被前面的 ASCII 干扰）
+        enc = _detect_enc_bytes(data[e.start:e.start + sample_size], default_encoding)
+        try:
+            text = data.decode(enc)
+        except UnicodeDecodeError:
+            text = data.decode(enc, errors='replace')
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+def is_port_valid(p: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        if os.name != 'nt': # 忽略 TIME_WAIT；windows 下 SO_REUSEADDR 允许绑定已被占用的端口，不能用
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(('127.0.0.1', p))
+            return True
+        except OSError:
+            return False
+
+@functools.lru_cache(maxsize=64)
+def _compile(pattern: str, flags=0) -> re.Pattern:
+    return re.compile(pattern, flags)
 
 def insert_str(html: str, insert: str, where: str = '</html>', *, forward: bool = False, before: bool = True) -> str:
     """ 在网页中搜索“定位字符串”，插入字符串
@@ -87,16 +194,39 @@ def insert_str(html: str, insert: str, where: str = '</html>', *, forward: bool
         before (bool): True: 插入在“定位字符串”之前，False: 之后
     ~~~
     """
-    if forward:
-        p = html.lower().find(where.lower())
-    else:
-        p = html.lower().rfind(where.lower())
+    p = _find_str(html, where, forward, before)
     if p >= 0:
-        if not before:
-            p = p + len(where)
         html = html[:p] + insert + html[p:]
     return html
 
+def _find_str(html: str, where: str, forward: bool = False, before: bool = True) -> int:
+    """ 查找“定位字符串”（大小写无关）的插入位置，找不到时返回 -1，参数同 `insert_str` """
+    pattern = _compile(re.escape(where), re.IGNORECASE)
+    if forward:
+        m = pattern.search(html)
+    else:
+        m = None
+        for m in pattern.finditer(html):
+            pass
+    if not m:
+        return -1
+    return m.start() if before else m.end()
+
+def _insert_many(html: str, inserts: Iterable[Tuple[int, str]]) -> str:
+    """ 在多个位置插入字符串，只拼接一次
+
+    Args:
+        inserts: [(插入位置, 插入字符串), ...]，插入位置 < 0 的忽略
+    """
+    parts = []
+    last = 0
+    for p, s in sorted((i for i in inserts if i[0] >= 0), key=lambda i: i[0]):
+        parts.append(html[last:p])
+        parts.append(s)
+        last = p
+    parts.append(html[last:])
+    return ''.join(parts)
+
 def append_js(html: str, js_file: str = '', js_str: str = '') -> str:
     """ 在网页 "</html>" 前插入 "载入 js_file 和 js_str" 的 <script> 语句
 
@@ -116,11 +246,19 @@ def append_js(html: str, js_file: str = '', js_str: str = '') -> str:
     Returns:
         处理后的 html
     """
+    scripts = _script_tags(js_file, js_str)
+    return insert_str(html, scripts) if scripts else html
+
+def _script_tags(js_file: str = '', js_str: str = '') -> str:
+    """ 生成“载入 js_file 和 js_str”的 <script> 语句 """
+    scripts = ''
     if js_file:
-        html = insert_str(html, f'<script src="{js_file}"></script>\n')
+        scripts += f'<script src="{js_file}"></script>\n'
     if js_str:
-        html = insert_str(html, f'<script>\n{js_str}\n</script>\n')
-    return html
+        scripts += f'<script>\n{js_str}\n</script>\n'
+    return scripts
+
+_COMMENT_REPL = r'<!-- \g<0> -->'
 
 def comment_html(html: str, regex_to_comment: str, regex_flags = re.IGNORECASE) -> str:
     """ 注释掉网页内所有符合正则表达式的字符串
@@ -135,9 +273,7 @@ def comment_html(html: str, regex_to_comment: str, regex_flags = re.IGNORECASE)
     Returns:
         处理后的 html
     """
-    for m in re.finditer(regex_to_comment, html, regex_flags):
-        html = html[:m.start()] + '<!-- ' + html[m.start():m.end()] + ' -->' + html[m.end():]
-    return html
+    return _compile(regex_to_comment, regex_flags).sub(_COMMENT_REPL, html)
 
 def comment_js_file(html: str, js_file: str) -> str:
     """ 注释掉网页内加载 js_file 的语句
@@ -155,8 +291,27 @@ def comment_js_file(html: str, js_file: str) -> str:
     Returns:
         处理后的 html
     """
-    safe_str = js_file.replace('.', '\\.')
-    return comment_html(html, f'''<script\\s+.+{safe_str}["']>\\s*</script>''')
+    return comment_js_files(html, [js_file])
+
+def comment_js_files(html: str, js_files: Iterable[str]) -> str:
+    """ 注释掉网页内加载 js_files 中任一 js 文件的语句
+
+    所有 js 文件合并为一个正则表达式，只扫描一次网页。
+
+    Args:
+        html (str): 待处理的 html
+        js_files (Iterable[str]): js 文件 URL 字符串列表，规则同 `comment_js_file`
+
+    Returns:
+        处理后的 html
+    """
+    pattern = _js_files_re(js_files)
+    return pattern.sub(_COMMENT_REPL, html) if pattern else html
+
+def _js_files_re(js_files: Iterable[str]) -> Optional[re.Pattern]:
+    """ 匹配加载 js_files 中任一 js 文件语句的正则表达式，js_files 为空时返回 None """
+    alt = '|'.join(re.escape(j) for j in js_files)
+    return _compile(f'''<script\\s+[^>]*(?:{alt})["']>\\s*</script>''', re.IGNORECASE) if alt else None
 
 def inject_webui_js(html: str) -> str:
     """ 在网页末尾增加载入 webui的 js 代码
@@ -168,6 +323,14 @@ def inject_webui_js(html: str) -> str:
     """
     return append_js(html, js_file='/webui.js')
 
+def pure(func):
+    """ 装饰器：标记函数为“纯函数”（无副作用，相同参数返回相同结果）
+
+    `webwin.batch()` 批量调用时，同一批内参数相同的纯函数调用只执行一次。
+    """
+    func._webwin_pure = True
+    return func
+
 def webwin_wait():
     """ 等待所有窗口关闭 """
     webui.wait()
@@ -180,10 +343,16 @@ def webwin_exit():
     webui.exit()
 
 
+# 支持的浏览器类型: webui 浏览器参数值
+_WEBUI_BROWSERS = {name: getattr(webui.browser, name) for name in webui.browser.__annotations__}
+_WEBUI_BROWSERS_STR = ', '.join(_WEBUI_BROWSERS)
+
+
 class WebWin:
     """ 浏览器窗口 """
 
-    WEBWIN_JS_TEMPLATE = '''
+    # webwin js = WEBWIN_JS_HEADER + 后端提供的对象、函数 + WEBWIN_JS_FOOTER
+    WEBWIN_JS_HEADER = '''
 /**
 * WebWin js
 *
@@ -199,15 +368,62 @@ async _call_(fname, ...args) {
         throw e;
     }
 },
+_batch_queue_: [],
+/*
+ 批量调用后端函数，多个调用只需一次前后端往返
+ calls: [{method: "bindname", args: [...]}, ...]
+        args 中的 {"$ref": i} 会被替换为本批第 i 个调用的返回值
+ 5ms 内发起的多个 batch() 会合并为一次后端调用，但各自独立执行，出错互不影响
+ 返回: 各调用的返回值列表
+ */
+batch(calls) {
+    return new Promise((resolve, reject) => {
+        webwin._batch_queue_.push({calls, resolve, reject});
+        if (webwin._batch_queue_.length == 1) { setTimeout(webwin._batch_flush_, 5); }
+    });
+},
+async _batch_flush_() {
+    let queue = webwin._batch_queue_;
+    webwin._batch_queue_ = [];
+    let segments = [], sent = [];
+    for (let q of queue) {
+        // {"$ref": i} 只能引用本次 batch() 中前面的调用
+        let bad = null;
+        let calls = q.calls.map((c, i) => ({method: c.method, args: (c.args || []).map(a => {
+            if (a !== null && typeof a == "object" && "$ref" in a) {
+                let r = a["$ref"];
+                if (!Number.isInteger(r) || r < 0 || r >= i) { bad = bad || RangeError("invalid $ref: " + JSON.stringify(r)); }
+            }
+            return a;
+        })}));
+        if (bad) { q.reject(bad); continue; }
+        segments.push(calls);
+        sent.push(q);
+    }
+    if (!sent.length) { return; }
+    let rets;
+    try {
+        rets = await webwin._call_("_batch_", segments);
+    } catch (e) {
+        for (let q of sent) { q.reject(e); }
+        return;
+    }
+    // 每个 batch() 只得到自己那一段的结果
+    sent.forEach((q, i) => {
+        if (rets[i].status == "succ") { q.resolve(rets[i].retval); }
+        else { q.reject(Error("Backend-Error: " + rets[i].msg)); }
+    });
+},
 /* Back-end exported objects and functions */
+_version_: "%s",
+
+''' % __version__
 
-/*_WEBWIN_EXPOSE_END_*/
+    WEBWIN_JS_FOOTER = '''
 };
 console.log('webwin.js loaded.');
 '''
 
-    WEBEIN_JS_EXPOSE_END = '/*_WEBWIN_EXPOSE_END_*/'
-
     def __init__(self,
                  webroot: str = '.',
                  port: int = 0,
@@ -222,13 +438,16 @@ console.log('webwin.js loaded.');
             size: 窗口大小(width, height), list or tuple
                   当前(webui2==2.4.5)， webui.window.set_size() 不是对所有浏览器生效，edge:ok, firefox:NO
         """
+        _check_webui2_version()
         self.webroot = webroot
         self.port = port
         self.browser = browser
         self.size = size
         self._webui_win = webui.window()
-        self.webwin_js = self.WEBWIN_JS_TEMPLATE
-        self._webwin_js_expose(f'_version_: "{__version__}",')
+        self._bound_funcs = {}
+        self._shown = None
+        self._expose_parts: List[str] = []
+        self._bind_func(self._batch_exec_segments, '_batch_')
 
     @property
     def browser(self) -> str:
@@ -239,37 +458,105 @@ console.log('webwin.js loaded.');
         if val not in self.valid_browser_types():
             raise ValueError(f'invalid "browser" type: "{val}"')
         self._browser = val
-
-    @property
-    def _webui_browser(self) -> int:
-        return webui.browser.__dict__.get(self._browser, webui.browser.any)
+        self._webui_browser_int = _WEBUI_BROWSERS[val]
 
     @staticmethod
     def valid_browser_types() -> List[str]:
         """ “支持的浏览器类型”参数值列表 """
-        return webui.browser.__annotations__.keys()
+        return _WEBUI_BROWSERS.keys()
 
     def _bind_func(self, f, bindname):
         def wrapper(e: webui.event):
             args_j = e.window.get_str(e, 0)
-            args = json.loads(args_j) if args_j else []
+            args = _json_loads(args_j) if args_j else []
             try:
                 retval = f(*args)
-                return json.dumps({'status': 'succ', 'retval': retval}, ensure_ascii=False)
+                if retval is None:
+                    return '{"status":"succ","retval":null}'
+                return '{"status":"succ","retval":' + _json_dumps(retval) + '}'
             except Exception as ex:
-                return json.dumps({'status': 'fail', 'msg': repr(ex)}, ensure_ascii=False)
+                return '{"status":"fail","msg":' + _json_dumps(repr(ex)) + '}'
         self._webui_win.bind(bindname, wrapper)
+        self._bound_funcs[bindname] = f
+
+    def _batch_exec(self, calls: List[Dict]) -> list:
+        """ 依次执行前端 `webwin.batch()` 提交的一批调用
+
+        同一批内参数相同的纯函数（`@pure`）调用只执行一次，直接复用结果；
+        执行非纯函数后，可能改变了状态，之前的结果不再复用。
+
+        Args:
+            calls: [{"method": bindname, "args": [...]}, ...]
+                   args 中的 `{"$ref": i}` 替换为第 i 个调用的返回值
+
+        Returns:
+            各调用的返回值列表
+        """
+        results = []
+        seen = {}
+
+        def ref(i):
+            # bool 是 int 的子类，负数会从末尾取值，都不接受
+            if type(i) is not int or not 0 <= i < len(results):
+                raise ValueError(f'invalid $ref: {i!r}')
+            return results[i]
+
+        for c in calls:
+            f = self._bound_funcs[c['method']]
+            args = [ref(a['$ref']) if isinstance(a, dict) and '$ref' in a else a for a in c.get('args', [])]
+            if getattr(f, '_webwin_pure', False):
+                key = (c['method'], _json_key(args))
+                if key not in seen:
+                    seen[key] = f(*args)
+                results.append(seen[key])
+            else:
+                seen.clear()
+                results.append(f(*args))
+        return results
+
+    def _batch_exec_segments(self, segments: List[List[Dict]]) -> List[Dict]:
+        """ 执行 `_batch_flush_` 合并提交的多个 `webwin.batch()`
+
+        每段（一个 `webwin.batch()` 的调用列表）独立执行，一段出错不影响其他段。
+
+        Returns:
+            各段结果 [{"status": "succ", "retval": [...]} 或 {"status": "fail", "msg": "..."}, ...]
+        """
+        rets = []
+        for calls in segments:
+            try:
+                rets.append({'status': 'succ', 'retval': self._batch_exec(calls)})
+            except Exception as ex:
+                rets.append({'status': 'fail', 'msg': repr(ex)})
+        return rets
+
+    @property
+    def webwin_js(self) -> str:
+        """ webwin js 代码 """
+        return ''.join((self.WEBWIN_JS_HEADER, *self._expose_parts, self.WEBWIN_JS_FOOTER))
 
     def _webwin_js_expose(self, js_str: str, end: str = '\n'):
-        self.webwin_js = insert_str(self.webwin_js, js_str + end, where=self.WEBEIN_JS_EXPOSE_END)
+        self._expose_parts.append(js_str + end)
+        # 网页（含 webwin js）正在显示，同时添加到网页的 webwin 对象中；
+        # 失败不影响已完成的后端绑定，网页下次显示时会包含完整的 webwin js
+        if self._shown and self._shown[2] and self._webui_win.is_shown():
+            try:
+                self.run_js(f'Object.assign(webwin, {{\n{js_str}\n}});')
+            except Exception as e:
+                print(f'webwin expose to shown page failed: {e}')
 
-    def _expose_func(self, f, bindname: str, jsname: str = ''):
-        """ 在 webwinjs 中添加 js 函数 """
+    @staticmethod
+    def _func_js(f, bindname: str, jsname: str = '') -> str:
+        """ 生成调用后端函数的 js 函数代码 """
         docstring = '/*\n' + f.__doc__ + '\n */' if f.__doc__ else ''
-        self._webwin_js_expose(f'''{docstring}
+        return f'''{docstring}
 async {jsname or bindname}(...args) {{
     return await webwin._call_("{bindname}", ...args);
-}},''')
+}},'''
+
+    def _expose_func(self, f, bindname: str, jsname: str = ''):
+        """ 在 webwinjs 中添加 js 函数 """
+        self._webwin_js_expose(self._func_js(f, bindname, jsname))
         print(f'webwin exposed func: {bindname}')
 
     def bind_func(self, func, bindname: str = ''):
@@ -286,6 +573,22 @@ async {jsname or bindname}(...args) {{
         self._bind_func(func, bindname)
         self._expose_func(func, bindname)
 
+    def bind_bulk(self, items: Dict[str, Callable]):
+        """ 将多个 Python 函数一次性提供给前端 js
+
+        Args:
+            items (dict): {前端使用的函数名: 函数}
+        """
+        for bindname, func in items.items():
+            if not callable(func):
+                raise TypeError(f'Not callable: {repr(func)}')
+        js = []
+        for bindname, func in items.items():
+            self._bind_func(func, bindname)
+            js.append(self._func_js(func, bindname))
+            print(f'webwin exposed func: {bindname}')
+        self._webwin_js_expose('\n'.join(js))
+
     def bind_object(self, obj, bindname: str = ''):
         """ 将 Python 对象的方法提供给前端 js
 
@@ -297,13 +600,28 @@ async {jsname or bindname}(...args) {{
         """
         if not bindname:
             bindname = obj.__class__.__name__.lower()
-        self._webwin_js_expose(bindname + ': {')
-        for m in inspect.getmembers(obj, predicate=lambda x: inspect.ismethod(x) and not x.__name__.startswith('_')):
-            funcbindname = f'{bindname}.{m[0]}'
-            funcjsname = m[0]
-            self._bind_func(m[1], funcbindname)
-            self._expose_func(m[1], bindname=funcbindname, jsname=funcjsname)
-        self._webwin_js_expose('},')
+        js = [bindname + ': {']
+        # 从实例及 MRO 各类的 __dict__ 收集名字（不用 inspect.getmembers，以免触发所有 property）
+        names = set(getattr(obj, '__dict__', ()))
+        cls_attrs = {}
+        for cls in reversed(type(obj).__mro__): # 子类覆盖父类同名属性
+            cls_attrs.update(vars(cls))
+        names.update(cls_attrs)
+        for name in sorted(names):
+            if name.startswith('_') or isinstance(cls_attrs.get(name), property):
+                continue
+            try:
+                method = getattr(obj, name)
+            except AttributeError:
+                continue
+            if not inspect.ismethod(method):
+                continue
+            funcbindname = f'{bindname}.{name}'
+            self._bind_func(method, funcbindname)
+            js.append(self._func_js(method, bindname=funcbindname, jsname=name))
+            print(f'webwin exposed func: {funcbindname}')
+        js.append('},')
+        self._webwin_js_expose('\n'.join(js))
         print(f'webwin exposed object: {bindname}')
 
     def inject_webwin_js(self, html: str) -> str:
@@ -322,13 +640,14 @@ async {jsname or bindname}(...args) {{
             html (str): HTML 字符串
             append_webui_js (bool): 是否在 HTML 末尾插入 webui 功能 js 代码。
         """
-        html = insert_str(html, '<meta http-equiv="Content-Type" content="text/html; charset=utf-8" />', '<head>', forward=True, before=False)
-        if append_webui_js:
-            html = inject_webui_js(html)
-        if append_webwin_js:
-            html = self.inject_webwin_js(html)
+        self._shown = (html, append_webui_js, append_webwin_js)
+        # 插入 Content-Type 和 webui js, webwin js，只拼接一次网页
+        html = _insert_many(html, (
+            (_find_str(html, '<head>', forward=True, before=False), '<meta http-equiv="Content-Type" content="text/html; charset=utf-8" />'),
+            (_find_str(html, '</html>'), _script_tags('/webui.js' if append_webui_js else '', self.webwin_js if append_webwin_js else '')),
+        ))
         self._prepare_webui()
-        self._webui_win.show(html, self._webui_browser)
+        self._webui_win.show(html, self._webui_browser_int)
         self.run_js('if ("on_webwin_loaded" in window && window.on_webwin_loaded) { window.on_webwin_loaded(); }')
 
     def show_file(self, html_file: str = 'index.html', append_webui_js: bool = True, append_webwin_js: bool = True):
@@ -338,8 +657,7 @@ async {jsname or bindname}(...args) {{
             html_file (str): HTML 文件路径（基于网页根目录的相对路径 或者 绝对路径）
             append_webui_js (bool): 是否在 HTML 末尾插入 webui 功能 js 代码。
         """
-        with open_any_enc(os.path.normpath(os.path.join(self.webroot, html_file))) as f:
-            html = str(f.read())
+        html = read_text_any_enc(os.path.normpath(os.path.join(self.webroot, html_file)))
         self.show_html(html, append_webui_js, append_webwin_js)
 
     def run_js(self, js: str):
@@ -374,11 +692,11 @@ async {jsname or bindname}(...args) {{
         """
         if not os.path.exists(js_file):
             raise FileNotFoundError(js_file)
-        with open_any_enc(js_file) as f:
-            print(f'webui run js: {js_file}')
-            res_data = self.run_js(str(f.read()))
-            self.run_js(f'console.log("{os.path.basename(js_file)} loaded.");')
-            return res_data
+        js = read_text_any_enc(js_file)
+        print(f'webui run js: {js_file}')
+        res_data = self.run_js(js)
+        self.run_js(f'console.log("{os.path.basename(js_file)} loaded.");')
+        return res_data
 
     def close(self):
         """ 关闭窗口
@@ -387,6 +705,15 @@ async {jsname or bindname}(...args) {{
         """
         self._webui_win.close()
 
+    def reopen(self):
+        """ 重新打开关闭（close）后的窗口，展示上次的网页
+
+        复用窗口及已绑定的函数，无需重新绑定、读取网页文件
+        """
+        if not self._shown:
+            raise RuntimeError('webwin has not been shown yet')
+        self.show_html(*self._shown)
+
     def destroy(self):
         """ 销毁窗口
 
@@ -421,28 +748,33 @@ class FileSystem:
         Returns:
             字典对象列表，字典键值：name, fullpath, type, size, ctime, mtime, atime
         """
-        if pathlib.Path(dir).is_dir():
+        if os.path.isdir(dir):
+            pat_re = _compile(fnmatch.translate(os.path.normcase(pattern))) if pattern else None
+            type = (type or '').lower()
             ret = []
             with os.scandir(dir) as lst:
                 for e in lst:
-                    stat = e.stat()
-                    node = {'name': e.name,
-                            'fullpath': e.path,
-                            'type': 'file' if e.is_file() else 'dir' if e.is_dir() else 'symlink' if e.is_symlink() else '',
-                            'size':stat.st_size,
-                            'ctime': datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S'),
-                            'mtime': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
-                            'atime': datetime.fromtimestamp(stat.st_atime).strftime('%Y-%m-%d %H:%M:%S'),
-                            }
-                    if (not pattern or fnmatch.fnmatch(e.name, pattern)) and (not type or node['type'] == type.lower()):
-                        ret.append(node)
+                    if pat_re and not pat_re.match(os.path.normcase(e.name)):
+                        continue
+                    st = e.stat()
+                    t = 'file' if stat.S_ISREG(st.st_mode) else 'dir' if stat.S_ISDIR(st.st_mode) else 'symlink' if e.is_symlink() else ''
+                    if type and t != type:
+                        continue
+                    ret.append({'name': e.name,
+                                'fullpath': e.path,
+                                'type': t,
+                                'size': st.st_size,
+                                'ctime': time.strftime(_TIME_FMT, time.localtime(st.st_ctime)),
+                                'mtime': time.strftime(_TIME_FMT, time.localtime(st.st_mtime)),
+                                'atime': time.strftime(_TIME_FMT, time.localtime(st.st_atime)),
+                                })
             return ret
         else:
             raise FileNotFoundError(dir)
 
     def cwd(self) -> str:
         """ 获取当前目录 """
-        return os.path.abspath(os.getcwd())
+        return os.getcwd()
 
     def readfile(self, path: str, encoding: str = "") -> str:
         """ 读文件
@@ -454,13 +786,12 @@ class FileSystem:
         Returns:
             (str) 文件内容
         """
-        if pathlib.Path(path).is_file():
+        if os.path.isfile(path):
             if encoding:
                 with open(path, encoding=encoding) as f:
                     return f.read()
             else:
-                with open_any_enc(path) as f:
-                    return f.read()
+                return read_text_any_enc(path)
         raise FileNotFoundError(path)
 
     def writefile(self, path: str, text: str, mode: str = 'w', encoding: str = "utf-8"):
@@ -481,9 +812,9 @@ class FileSystem:
         Args:
             path (str): 文件路径
         """
-        if pathlib.Path(path).is_file():
-            os.remove(path)
-        raise FileNotFoundError(path)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        os.remove(path)
 
 
 class DualOutputIO(io.StringIO):
@@ -540,17 +871,34 @@ class DualOutputIO(io.StringIO):
 
 
 class FileLog(io.StringIO):
+    """ 日志文件输出IO
+
+    首次写入时打开日志文件（追加、行缓冲），之后一直使用该文件。
+    程序退出时关闭文件；关闭后如再有写入（如其他 atexit 处理函数的输出），重新打开文件。
+    """
+
     def __init__(self, filename: str):
         super().__init__()
         self.filename = filename
+        self._f = None
+        atexit.register(self.close_file)
+
+    def _file(self):
+        if self._f is None:
+            self._f = open(self.filename, 'a', buffering=1, encoding='utf-8')
+        return self._f
+
+    def close_file(self):
+        """ 关闭日志文件，之后写入时会重新打开 """
+        f, self._f = self._f, None
+        if f is not None:
+            f.close()
 
     def write(self, __s: str) -> int:
-        with open(self.filename, 'a') as f:
-            return f.write(datetime.now().strftime('%Y-%m-%d %H:%M:%S') + ' ' + __s)
+        return self._file().write(time.strftime(_TIME_FMT) + ' ' + __s)
 
     def writelines(self, __lines: Iterable[str]) -> None:
-        with open(self.filename, 'a') as f:
-            return f.writelines(__lines)
+        return self._file().writelines(__lines)
 
 
 class WebWinAppArgs(argparse.Namespace):
@@ -660,6 +1008,25 @@ class WebWinApp:
             # print('del_arg:', arg_name)
             self._wwa_args.pop(first_arg_name, None)
 
+        def adjust_arguments(self, spec: Dict[str, Dict]):
+            """ 批量修改、删除参数项
+
+            ```
+            self.argparser.adjust_arguments({
+                '--port': {'required': True}, # 同 mod_argument('--port', required=True)
+                '--size': None,               # 同 del_argument('--size')
+            })
+            ```
+
+            Args:
+                spec (dict): {第一个参数名: 参数设置}，参数设置为 dict 时修改参数项，为 None 时删除参数项
+            """
+            for name, kwargs in spec.items():
+                if kwargs is None:
+                    self.del_argument(name)
+                else:
+                    self.mod_argument(name, **kwargs)
+
         @property
         def args_list(self):
             """ 当前已添加的参数项名列表
@@ -695,6 +1062,8 @@ class WebWinApp:
         self._enable_args_file = enable_args_file
         self._enable_cmdline_args = enable_cmdline_args
         self._mainwin = WebWin()
+        self._mainpage_cache = None
+        self._del_js_re = None
         self.args = args
         self.argparser = WebWinApp.ArgParser(allow_abbrev=False)
         self.argparser._wwa_app_info = (self.APP_NAME, self.APP_VER, self.APP_DESC)
@@ -708,16 +1077,20 @@ class WebWinApp:
 
     def _build_base_paths(self):
         if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):  # 判断当前执行程序是否是 PyInstaller 打包后的 exe
-            self.PROG_FILE = os.path.abspath(sys.executable)
+            prog_file = os.path.abspath(sys.executable)
+            prog_dir = os.path.dirname(prog_file)
             self.BUNDLE_DIR = sys._MEIPASS
         else: # .py
-            self.PROG_FILE = os.path.abspath(sys.argv[0])
-            self.BUNDLE_DIR = os.path.dirname(self.PROG_FILE)
-        self.PROG_NAME = os.path.splitext(os.path.basename(self.PROG_FILE))[0]
-        self.PROG_DIR = os.path.dirname(self.PROG_FILE)
-        self.ARGS_FILE = os.path.join(self.PROG_DIR, self.PROG_NAME + '.args')
-        self.LOG_FILE = os.path.join(self.PROG_DIR, self.PROG_NAME + '.log')
-        self.CUR_DIR = os.path.abspath(os.getcwd())
+            prog_file = os.path.abspath(sys.argv[0])
+            prog_dir = os.path.dirname(prog_file)
+            self.BUNDLE_DIR = prog_dir
+        prog_name = os.path.splitext(os.path.basename(prog_file))[0]
+        self.PROG_FILE = prog_file
+        self.PROG_NAME = prog_name
+        self.PROG_DIR = prog_dir
+        self.ARGS_FILE = os.path.join(prog_dir, prog_name + '.args')
+        self.LOG_FILE = os.path.join(prog_dir, prog_name + '.log')
+        self.CUR_DIR = os.getcwd()
 
     def log(self, msg: str):
         """ 记录信息（输出到sys.stdout） """
@@ -756,9 +1129,11 @@ class WebWinApp:
         """
         args = []
         if self._enable_args_file and os.path.exists(self.ARGS_FILE):
-            with open_any_enc(self.ARGS_FILE) as f:
-                s = f.read()
-            args = [s.strip('"') for s in shlex.split(s, comments=True, posix=(os.name == 'posix'))]
+            s = read_text_any_enc(self.ARGS_FILE)
+            if any(c in s for c in '"\'#\\'): # 有引号、注释、转义时才需要 shlex
+                args = [s.strip('"') for s in shlex.split(s, comments=True, posix=(os.name == 'posix'))]
+            else:
+                args = s.split()
             self.log(f'args file: {args}')
         if self._enable_cmdline_args:
             self.log(f'args cmdline: {sys.argv[1:]}')
@@ -777,7 +1152,7 @@ class WebWinApp:
         self.argparser.add_argument('--webroot', default='', help='网页根目录（相对或绝对路径）[默认: 当前目录]')
         self.argparser.add_argument('--mainpage', metavar='HTML_FILE', default='index.html', help='应用主页 [默认: index.html]')
         self.argparser.add_argument('--port', type=int, default=0, help='端口 [默认: 随机]')
-        self.argparser.add_argument('--browser', type=WebWinAppArgs.browser_type, default='any', help=f'使用的浏览器（必须是本机已安装的）[默认: 系统缺省浏览器][可选项: {", ".join(self.mainwin.valid_browser_types())}]')
+        self.argparser.add_argument('--browser', type=WebWinAppArgs.browser_type, default='any', help=f'使用的浏览器（必须是本机已安装的）[默认: 系统缺省浏览器][可选项: {_WEBUI_BROWSERS_STR}]')
         # webui.window.set_size() 不是对所有浏览器生效，edge:ok, firefox:NO (webui2==2.4.5)
         # self._argparser.add_argument('--size', metavar='WIDTH,HEIGHT', type=WebWinAppArgs.size_type, default=(0, 0), help='窗口大小 [默认: 上次运行时大小]')
         self.argparser.add_argument('--del-js', metavar='DEL.JS', nargs='*', default=[], help='禁止主页加载 js 脚本文件')
@@ -812,20 +1187,38 @@ class WebWinApp:
         self.mainwin.bind_object(FileSystem(), 'fs')
 
     def show_msg_page(self, msg: str='', add_help_msg: bool=True):
+        if add_help_msg and self.help_msg is None:
+            self.help_msg = self.argparser.format_help()
         self.mainwin.show_html(f'''<html>
             <head><meta charset="UTF-8" /><title>{self.APP_NAME} v{self.APP_VER}</title></head>
             <body style="background:#fdf3df;">{msg}<hr>
             <pre style="font-size:1rem;color:gray">{self.help_msg if add_help_msg else ''}</pre></body>
             </html>''')
 
+    def _load_mainpage(self) -> str:
+        """ 读取应用主页，并注释掉 del_js
+
+        结果按 (主页路径, 修改时间, 文件大小, del_js) 缓存，再次 run() 时主页未改变则不再重复处理。
+        """
+        st = os.stat(self.args.mainpage)
+        key = (self.args.mainpage, st.st_mtime_ns, st.st_size, tuple(self.args.del_js))
+        if self._mainpage_cache and self._mainpage_cache[0] == key:
+            return self._mainpage_cache[1]
+        html = read_text_any_enc(self.args.mainpage)
+        if self._del_js_re:
+            html = self._del_js_re.sub(_COMMENT_REPL, html)
+        self._mainpage_cache = (key, html)
+        return html
+
     def run(self):
         """ 获取参数，打开窗口显示网页 """
         try:
             if (self._enable_args_file or self._enable_cmdline_args):
                 self._prepare_argparser()
-                self.help_msg = self.argparser.format_help()
+                self.help_msg = None # 用到时再生成（show_msg_page）
                 self._parse_args()
                 self.apply_args()
+            self._del_js_re = _js_files_re(self.args.del_js)
             if self.args.port and not is_port_valid(self.args.port):
                 self.mainwin.port = 0
                 self.show_msg_page(f'<h1>端口被占用！</h1>【端口】{self.args.port}')
@@ -840,11 +1233,7 @@ class WebWinApp:
                 self.mainwin.browser = self.args.browser
                 self.mainwin.size = self.args.size
                 self.bind_all()
-                with open_any_enc(self.args.mainpage) as f:
-                    html = f.read()
-                for js in self.args.del_js:
-                    html = comment_js_file(html, js)
-                self.mainwin.show_html(html)
+                self.mainwin.show_html(self._load_mainpage())
                 for js in [os.path.normpath(os.path.join(self.CUR_DIR, j)) for j in self.args.run_js]:
                     try:
                         self.mainwin.run_js_file(js)
@@ -861,6 +1250,19 @@ class WebWinApp:
         except:
             self.log_exc()
 
+    async def wait_async(self):
+        """ 等待*所有*窗口关闭（asyncio 版本，不阻塞事件循环）
+
+        ```
+        async def main():
+            app.run()
+            await app.wait_async()
+        asyncio.run(main())
+        ```
+        """
+        import asyncio # 用到时才导入，不拖慢 import webwin
+        await asyncio.to_thread(self.wait)
+
     def exit(self):
         """ 关闭所有窗口，并释放 WebWin 资源
 